@@ -16,8 +16,10 @@ automatically enabled if you use :py:mod:`config` module.
 
 import argparse
 import datetime
+import functools
 import logging
 import os
+import re
 from typing import Any, Optional
 
 from overrides import overrides
@@ -28,6 +30,63 @@ from overrides import overrides
 logger = logging.getLogger(__name__)
 
 
+# The validators below need string_utils and datetime_utils but
+# importing them eagerly would make everyone who imports this module
+# pay for them.  These import them the first time they're needed and
+# then hand back the cached module so that subsequent calls don't pay
+# for running an import statement.
+@functools.lru_cache(maxsize=None)
+def _string_utils():
+    from pyutils import string_utils
+
+    return string_utils
+
+
+@functools.lru_cache(maxsize=None)
+def _datetime_utils():
+    from pyutils.datetimes import datetime_utils
+
+    return datetime_utils
+
+
+# The common spellings of a bool on the commandline, so that we don't
+# need to call into string_utils.to_bool for them.
+_BOOL_MAP = {
+    "true": True,
+    "t": True,
+    "yes": True,
+    "y": True,
+    "on": True,
+    "1": True,
+    "false": False,
+    "f": False,
+    "no": False,
+    "n": False,
+    "off": False,
+    "0": False,
+}
+
+# A whole string MAC address (same grammar as string_utils uses).
+_MAC_RE = re.compile(r"^([0-9A-F]{2}[:-]){5}([0-9A-F]{2})$", re.IGNORECASE)
+
+# Simple durations like "3m" or "10s" can be handled without a trip
+# through datetime_utils.parse_duration.
+_SIMPLE_DURATION_RE = re.compile(r"^\s*(\d+)\s*([smhd])\s*$")
+_SECONDS_PER_UNIT = {"s": 1, "m": 60, "h": 60 * 60, "d": 60 * 60 * 24}
+
+# The default output format of unix date(1), less the timezone.
+_UNIX_DATE_FORMAT = "%a %b %d %H:%M:%S %Y"
+
+# Error message formats used by the validators below.
+_MSG_IP = "%s is an invalid IP address"
+_MSG_MAC = "%s is an invalid MAC address"
+_MSG_PERCENT = "%s is an invalid percentage; expected 0 <= n <= 100.0"
+_MSG_FILE = "%s was not found and is therefore invalid."
+_MSG_DATE = "Cannot parse argument as a date: %s"
+_MSG_DATETIME = "Cannot parse argument as datetime: %s"
+_MSG_BYTE_COUNT = "Invalid byte count: %s"
+
+
 class ActionNoYes(argparse.Action):
     """An argparse Action that allows for commandline arguments like this::
 
@@ -84,14 +143,12 @@ class ActionNoYes(argparse.Action):
             required=required,
             help=help,
         )
+        self._no_opts = frozenset(["--no_" + opt, "--no-" + opt])
 
     @overrides
     def __call__(self, parser, namespace, values, option_strings: Optional[str] = None):
         if option_strings is not None:
-            if option_strings.startswith("--no-") or option_strings.startswith("--no_"):
-                setattr(namespace, self.dest, False)
-            else:
-                setattr(namespace, self.dest, True)
+            setattr(namespace, self.dest, option_strings not in self._no_opts)
 
 
 def valid_bool(v: Any) -> bool:
@@ -141,16 +198,31 @@ def valid_bool(v: Any) -> bool:
     argparse.ArgumentTypeError: 12345
 
     """
-    if isinstance(v, bool):
+    if v is True or v is False:
         return v
-    from pyutils.string_utils import to_bool
-
+    if isinstance(v, str):
+        b = _BOOL_MAP.get(v.lower())
+        if b is not None:
+            return b
     try:
-        return to_bool(v)
+        return _string_utils().to_bool(v)
     except Exception as e:
         raise argparse.ArgumentTypeError(v) from e
 
 
+def _is_dotted_quad(s: str) -> bool:
+    """True if s is exactly four dot separated decimal octets (0..255)."""
+    parts = s.split(".")
+    if len(parts) != 4:
+        return False
+    for part in parts:
+        if not (0 < len(part) <= 3 and part.isascii() and part.isdigit()):
+            return False
+        if int(part) > 255:
+            return False
+    return True
+
+
 def valid_ip(ip: str) -> str:
     """
     If the string is a valid IPv4 address, return it.  Otherwise raise
@@ -184,12 +256,14 @@ def valid_ip(ip: str) -> str:
     argparse.ArgumentTypeError: localhost is an invalid IP address
 
     """
-    from pyutils.string_utils import extract_ip_v4
+    s = ip.strip()
+    if _is_dotted_quad(s):
+        return s
 
-    s = extract_ip_v4(ip.strip())
+    s = _string_utils().extract_ip_v4(s)
     if s is not None:
         return s
-    msg = f"{ip} is an invalid IP address"
+    msg = _MSG_IP % ip
     logger.error(msg)
     raise argparse.ArgumentTypeError(msg)
 
@@ -230,12 +304,14 @@ def valid_mac(mac: str) -> str:
     argparse.ArgumentTypeError: big is an invalid MAC address
 
     """
-    from pyutils.string_utils import extract_mac_address
+    s = mac.strip()
+    if _MAC_RE.match(s) is not None:
+        return s
 
-    s = extract_mac_address(mac)
+    s = _string_utils().extract_mac_address(mac)
     if s is not None:
         return s
-    msg = f"{mac} is an invalid MAC address"
+    msg = _MSG_MAC % mac
     logger.error(msg)
     raise argparse.ArgumentTypeError(msg)
 
@@ -280,7 +356,7 @@ def valid_percentage(num: str) -> float:
     n = float(num)
     if 0.0 <= n <= 100.0:
         return n
-    msg = f"{num} is an invalid percentage; expected 0 <= n <= 100.0"
+    msg = _MSG_PERCENT % num
     logger.error(msg)
     raise argparse.ArgumentTypeError(msg)
 
@@ -326,7 +402,7 @@ def valid_filename(filename: str) -> str:
     s = filename.strip()
     if os.path.exists(s):
         return s
-    msg = f"{filename} was not found and is therefore invalid."
+    msg = _MSG_FILE % filename
     logger.error(msg)
     raise argparse.ArgumentTypeError(msg)
 
@@ -366,12 +442,10 @@ def valid_date(txt: str) -> datetime.date:
     >>> valid_date('next wednesday') # doctest: +ELLIPSIS
     -ANYTHING-
     """
-    from pyutils.string_utils import to_date
-
-    date = to_date(txt)
+    date = _string_utils().to_date(txt)
     if date is not None:
         return date
-    msg = f"Cannot parse argument as a date: {txt}"
+    msg = _MSG_DATE % txt
     logger.error(msg)
     raise argparse.ArgumentTypeError(msg)
 
@@ -423,13 +497,12 @@ def valid_datetime(txt: str) -> datetime.datetime:
     try:
         chunks = txt.split()
         if len(chunks) == 6:
-            from pyutils.datetimes import datetime_utils
-
+            datetime_utils = _datetime_utils()
             tz = datetime_utils.timezone_abbrev_to_tz(chunks[4])
             if tz:
                 # Chop out the timezone part, %Z (maybe) won't parse it.
                 txt = " ".join(chunks[:4] + [chunks[5]])
-                dt = datetime.datetime.strptime(txt, "%a %b %d %H:%M:%S %Y")
+                dt = datetime.datetime.strptime(txt, _UNIX_DATE_FORMAT)
 
                 # Force the right timezone guess
                 datetime_utils.replace_timezone(dt, tz)
@@ -438,13 +511,11 @@ def valid_datetime(txt: str) -> datetime.datetime:
         logger.exception("Ignoring exception from datetime_utils.")
 
     # Otherwise try dateparse_utils.
-    from pyutils.string_utils import to_datetime
-
-    dt = to_datetime(txt)
+    dt = _string_utils().to_datetime(txt)
     if dt is not None:
         return dt
 
-    msg = f"Cannot parse argument as datetime: {txt}"
+    msg = _MSG_DATETIME % txt
     logger.error(msg)
     raise argparse.ArgumentTypeError(msg)
 
@@ -500,10 +571,14 @@ def valid_duration(txt: str) -> datetime.timedelta:
     ...
     argparse.ArgumentTypeError: a little while is not a valid duration.
     """
-    from pyutils.datetimes.datetime_utils import parse_duration
+    m = _SIMPLE_DURATION_RE.match(txt)
+    if m is not None:
+        return datetime.timedelta(
+            seconds=int(m.group(1)) * _SECONDS_PER_UNIT[m.group(2)]
+        )
 
     try:
-        secs = parse_duration(txt, raise_on_error=True)
+        secs = _datetime_utils().parse_duration(txt, raise_on_error=True)
         return datetime.timedelta(seconds=secs)
     except Exception as e:
         logger.exception("Exception while parsing a supposed duration: %s", txt)
@@ -566,13 +641,11 @@ def valid_byte_count(txt: str) -> int:
     argparse.ArgumentTypeError: Invalid byte count: On a dark and stormy night
 
     """
-    from pyutils.string_utils import suffix_string_to_number
-
     try:
-        num_bytes = suffix_string_to_number(txt)
+        num_bytes = _string_utils().suffix_string_to_number(txt)
         if num_bytes:
             return num_bytes
-        raise argparse.ArgumentTypeError(f"Invalid byte count: {txt}")
+        raise argparse.ArgumentTypeError(_MSG_BYTE_COUNT % txt)
     except Exception as e:
         logger.exception("Exception while parsing a supposed byte count: %s", txt)
         raise argparse.ArgumentTypeError(e) from e
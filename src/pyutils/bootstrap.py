@@ -42,9 +42,10 @@ import importlib
 import importlib.abc
 import logging
 import os
+import random
+import re
 import sys
 import uuid
-from inspect import stack
 from typing import NoReturn
 
 from pyutils import config, logging_utils
@@ -147,6 +148,10 @@ def handle_uncaught_exception(exc_type, exc_value, exc_tb):
                 ORIGINAL_EXCEPTION_HOOK(exc_type, exc_value, exc_tb)
 
 
+# Frames from these files are import machinery, not the importer.
+IGNORED_IMPORTER_FILENAME_RE = re.compile(r"importlib|six\.py")
+
+
 class ImportInterceptor(importlib.abc.MetaPathFinder):
     """An interceptor that always allows module load events but dumps a
     record into the log and onto stdout when modules are loaded and
@@ -177,9 +182,22 @@ class ImportInterceptor(importlib.abc.MetaPathFinder):
                 fname = "unknown"
             self.module_by_filename_cache[fname] = mod
 
+    def find_module_by_filename(self, filename: str):
+        """Look up the module loaded from filename and remember it."""
+        if filename in self.module_by_filename_cache:
+            return self.module_by_filename_cache[filename]
+
+        # copy here because modules is volatile
+        for mod in list(sys.modules.values()):
+            if getattr(mod, "__file__", None) == filename:
+                self.module_by_filename_cache[filename] = mod
+                return mod
+        return "unknown"
+
     @staticmethod
+    @functools.lru_cache(maxsize=None)
     def should_ignore_filename(filename: str) -> bool:
-        return "importlib" in filename or "six.py" in filename
+        return IGNORED_IMPORTER_FILENAME_RE.search(filename) is not None
 
     def find_module(self, fullname, path) -> NoReturn:
         raise PyUtilsException(
@@ -187,25 +205,28 @@ class ImportInterceptor(importlib.abc.MetaPathFinder):
         )
 
     def find_spec(self, loaded_module, path=None, _=None):
-        s = stack()
-        for x in range(3, len(s)):
-            filename = s[x].filename
+        # Walk the frames directly rather than via inspect.stack(),
+        # which builds a FrameInfo (and reads source lines) for every
+        # frame on the stack.
+        try:
+            frame = sys._getframe(3)
+        except ValueError:
+            frame = None
+        while frame is not None:
+            filename = frame.f_code.co_filename
             if ImportInterceptor.should_ignore_filename(filename):
+                frame = frame.f_back
                 continue
 
-            loading_function = s[x].function
-            if filename in self.module_by_filename_cache:
-                loading_module = self.module_by_filename_cache[filename]
-            else:
-                self.repopulate_modules_by_filename()
-                loading_module = self.module_by_filename_cache.get(filename, "unknown")
+            loading_function = frame.f_code.co_name
+            loading_module = self.find_module_by_filename(filename)
 
             path = self.tree_node_by_module.get(loading_module, [])
             path.extend([loaded_module])
             self.tree.insert(path)
             self.tree_node_by_module[loading_module] = path
 
-            msg = f"*** Import {loaded_module} from {filename}:{s[x].lineno} in {loading_module}::{loading_function}"
+            msg = f"*** Import {loaded_module} from {filename}:{frame.f_lineno} in {loading_module}::{loading_function}"
             logger.debug(msg)
             print(msg)
             return
@@ -232,16 +253,16 @@ class ImportInterceptor(importlib.abc.MetaPathFinder):
 # Also note: move bootstrap up in the global import list to catch
 # more import events and have a more complete record.
 IMPORT_INTERCEPTOR = None
-for arg in sys.argv:
-    if arg == "--audit_import_events":
-        IMPORT_INTERCEPTOR = ImportInterceptor()
-        sys.meta_path.insert(0, IMPORT_INTERCEPTOR)
+if "--audit_import_events" in sys.argv:
+    IMPORT_INTERCEPTOR = ImportInterceptor()
+    sys.meta_path.insert(0, IMPORT_INTERCEPTOR)
 
 
 def dump_all_objects() -> None:
     """Helper code to dump all known python objects."""
 
     messages = {}
+    import_path_by_mod_name = {}
     all_modules = sys.modules
     for obj in object.__subclasses__():
         if not hasattr(obj, "__name__"):
@@ -261,7 +282,12 @@ def dump_all_objects() -> None:
             else:
                 mod_file = "unknown"
             if IMPORT_INTERCEPTOR is not None:
-                import_path = IMPORT_INTERCEPTOR.find_importer(mod_name)
+                # Many classes share a module; only look each up once.
+                if mod_name not in import_path_by_mod_name:
+                    import_path_by_mod_name[
+                        mod_name
+                    ] = IMPORT_INTERCEPTOR.find_importer(mod_name)
+                import_path = import_path_by_mod_name[mod_name]
             else:
                 import_path = "unknown"
             msg = f"{class_mod_name}::{klass} ({mod_file})"
@@ -313,7 +339,15 @@ def initialize(entry_point):
             entry_filename = 'UNKNOWN'
         config.parse(entry_filename)
 
-        if config.config["trace_memory"]:
+        # Read the flags we care about once.
+        trace_memory = config.config["trace_memory"]
+        run_profiler = config.config["run_profiler"]
+        should_dump_all_objects = config.config["dump_all_objects"]
+        audit_import_events = config.config["audit_import_events"]
+        set_random_seed = config.config["set_random_seed"]
+        show_random_seed = config.config["show_random_seed"]
+
+        if trace_memory:
             import tracemalloc
 
             tracemalloc.start()
@@ -355,14 +389,11 @@ def initialize(entry_point):
 
         # Allow programs that don't bother to override the random seed
         # to be replayed via the commandline.
-        import random
-
-        random_seed = config.config["set_random_seed"]
-        if random_seed is not None:
-            random_seed = random_seed[0]
+        if set_random_seed is not None:
+            random_seed = set_random_seed[0]
         else:
             random_seed = int.from_bytes(os.urandom(4), "little")
-        if config.config["show_random_seed"]:
+        if show_random_seed:
             msg = f"Global random seed is: {random_seed}"
             logger.debug(msg)
             print(msg)
@@ -378,25 +409,27 @@ def initialize(entry_point):
         ret = None
         from pyutils import stopwatch
 
-        if config.config["run_profiler"]:
+        if run_profiler:
             import cProfile
             from pstats import SortKey
 
+            # Profile the call directly (rather than via cProfile.runctx
+            # and a string to exec) so that we get its return value.
+            profiler = cProfile.Profile()
             with stopwatch.Timer() as t:
-                cProfile.runctx(
-                    "ret = entry_point(*args, **kwargs)",
-                    globals(),
-                    locals(),
-                    None,
-                    SortKey.CUMULATIVE,
-                )
+                profiler.enable()
+                try:
+                    ret = entry_point(*args, **kwargs)
+                finally:
+                    profiler.disable()
+                    profiler.print_stats(SortKey.CUMULATIVE)
         else:
             with stopwatch.Timer() as t:
                 ret = entry_point(*args, **kwargs)
 
         logger.debug("%s (program entry point) returned %s.", entry_descr, ret)
 
-        if config.config["trace_memory"]:
+        if trace_memory:
             snapshot = tracemalloc.take_snapshot()
             top_stats = snapshot.statistics("lineno")
             print()
@@ -404,10 +437,10 @@ def initialize(entry_point):
             for stat in top_stats[:10]:
                 print(stat)
 
-        if config.config["dump_all_objects"]:
+        if should_dump_all_objects:
             dump_all_objects()
 
-        if config.config["audit_import_events"]:
+        if audit_import_events:
             if IMPORT_INTERCEPTOR is not None:
                 print(IMPORT_INTERCEPTOR.tree)
 
@@ -31,8 +31,66 @@ Sample usage::
 
     # Note: type(y) is List since one value may map back to multiple keys.
 
+.. note::
+
+    ``inverse`` is a read-only :class:`InverseView` (a
+    :class:`collections.abc.Mapping`), not a ``dict``, and the key
+    lists it returns must not be modified; modify the
+    :class:`BiDict` instead.  Use ``dict(d.inverse)`` where a real
+    ``dict`` is needed (e.g. to JSON encode it).
+
 """
 
+from collections import defaultdict
+from typing import Any, Dict, Hashable, Iterator, List, Mapping, NoReturn, Optional
+
+# Stands in for "no such key" when probing the dict; can't be None
+# since None is a perfectly good value.
+_MISSING = object()
+
+
+class InverseView(Mapping):
+    """A read-only view of a :class:`BiDict`'s inverse mapping.  Maps
+    each value back to a list of the keys associated with it (in
+    the order in which they were added).
+
+    Internally the keys for each value are kept in an (insertion
+    ordered) dict rather than a list so that removing one key is
+    :math:`O(1)` regardless of how many keys share a value.  The
+    list for each value is built the first time it's asked for and
+    then reused until the :class:`BiDict` changes that value's keys,
+    so the lists returned must not be modified.
+    """
+
+    def __init__(self, buckets: Dict[Hashable, Dict[Hashable, None]]):
+        self._buckets = buckets
+        self._lists: Dict[Hashable, List[Any]] = {}
+
+    def __getitem__(self, value: Hashable) -> List[Any]:
+        keys = self._lists.get(value)
+        if keys is None:
+            # Note: buckets may be a defaultdict; don't let a lookup of
+            # a missing value create an empty bucket for it.
+            bucket = self._buckets.get(value)
+            if bucket is None:
+                raise KeyError(value)
+            keys = self._lists[value] = list(bucket)
+        return keys
+
+    def _invalidate(self, value: Hashable) -> None:
+        """Forget the cached list of keys for value; called by the
+        :class:`BiDict` whenever that value's keys change."""
+        self._lists.pop(value, None)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._buckets)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def __repr__(self) -> str:
+        return repr({value: list(keys) for value, keys in self._buckets.items()})
+
 
 class BiDict(dict):
     def __init__(self, *args, **kwargs):
@@ -60,26 +118,134 @@ class BiDict(dict):
         2
         >>> d.inverse[2]
         ['b']
+        >>> d['b'] = 3
+        >>> d.inverse
+        {1: ['a'], 3: ['b']}
+        >>> d['c'] = 3
+        >>> d['b'] = 3
+        >>> d.inverse[3]
+        ['b', 'c']
+        >>> d.inverse[3] is d.inverse[3]
+        True
+        >>> del d['b']
+        >>> d.inverse[3]
+        ['c']
+        >>> d['a'] = 3
+        >>> d.inverse[3]
+        ['c', 'a']
+        >>> 1 in d.inverse
+        False
 
         """
         super().__init__(*args, **kwargs)
-        self.inverse = {}
+        self._inverse: Dict[Hashable, Dict[Hashable, None]] = defaultdict(dict)
         for key, value in self.items():
-            self.inverse.setdefault(value, []).append(key)
+            self._inverse[value][key] = None
+        self.inverse = InverseView(self._inverse)
+
+    def __setitem__(self, key, value):
+        old_value = dict.get(self, key, _MISSING)
+        if old_value is not _MISSING:
+            if old_value == value:
+                # Same value again (common when re-reading a config
+                # or alias table): the inverse map needn't change.
+                dict.__setitem__(self, key, value)
+                return
+            keys = self._inverse[old_value]
+            del keys[key]
+            if not keys:
+                del self._inverse[old_value]
+            self.inverse._invalidate(old_value)
+        dict.__setitem__(self, key, value)
+        self._inverse[value][key] = None
+        self.inverse._invalidate(value)
+
+    def __delitem__(self, key):
+        value = dict.pop(self, key)
+        keys = self._inverse[value]
+        del keys[key]
+        if not keys:
+            del self._inverse[value]
+        self.inverse._invalidate(value)
+
+    def __reduce__(self):
+        """Copy and pickle by rebuilding from the plain key/value
+        pairs.  The default for dict subclasses would share the
+        inverse map with the original and then replay every item
+        through __setitem__, which :class:`FrozenBiDict` forbids.
+
+        >>> import copy
+        >>> d = BiDict(a=1)
+        >>> c = copy.copy(d)
+        >>> c['b'] = 1
+        >>> d.inverse[1], c.inverse[1]
+        (['a'], ['a', 'b'])
+        """
+        return (type(self), (dict(self),))
+
+
+class FrozenBiDict(BiDict):
+    """An immutable (and therefore hashable) :class:`BiDict`, e.g. for
+    alias tables that are built once and then only queried.  Its hash
+    is computed on first use and then cached.
+
+    >>> d = FrozenBiDict({'a': 1, 'b': 2, 'c': 2})
+    >>> d['a']
+    1
+    >>> d.inverse[2]
+    ['b', 'c']
+    >>> d['d'] = 3
+    Traceback (most recent call last):
+    ...
+    TypeError: 'FrozenBiDict' object does not support item assignment
+    >>> del d['a']
+    Traceback (most recent call last):
+    ...
+    TypeError: 'FrozenBiDict' object does not support item deletion
+    >>> hash(d) == hash(FrozenBiDict(c=2, b=2, a=1))
+    True
+    >>> len({d: 'ok'})
+    1
+
+    >>> import copy, pickle
+    >>> c = copy.deepcopy(d)
+    >>> type(c).__name__, c == d, c.inverse[2], hash(c) == hash(d)
+    ('FrozenBiDict', True, ['b', 'c'], True)
+    >>> pickle.loads(pickle.dumps(d)).inverse[2]
+    ['b', 'c']
+
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._hash: Optional[int] = None
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash(frozenset(self.items()))
+        return self._hash
+
+    def _immutable(self, *args, **kwargs) -> NoReturn:
+        raise TypeError(f"'{type(self).__name__}' object is immutable")
 
     def __setitem__(self, key, value):
-        if key in self:
-            old_value = self[key]
-            self.inverse[old_value].remove(key)
-        super().__setitem__(key, value)
-        self.inverse.setdefault(value, []).append(key)
+        raise TypeError(
+            f"'{type(self).__name__}' object does not support item assignment"
+        )
 
     def __delitem__(self, key):
-        value = self[key]
-        self.inverse.setdefault(value, []).remove(key)
-        if value in self.inverse and not self.inverse[value]:
-            del self.inverse[value]
-        super().__delitem__(key)
+        raise TypeError(
+            f"'{type(self).__name__}' object does not support item deletion"
+        )
+
+    # These dict methods would otherwise modify it (without updating
+    # the inverse map, to boot).
+    clear = _immutable
+    pop = _immutable
+    popitem = _immutable
+    setdefault = _immutable
+    update = _immutable
+    __ior__ = _immutable
 
 
 if __name__ == '__main__':
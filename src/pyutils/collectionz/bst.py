@@ -4,15 +4,19 @@
 
 """A binary search tree implementation."""
 
-from typing import Generator, List, Optional
+import array
+from typing import Generator, Iterable, List, Optional, Tuple
 
 from pyutils.typez.type_hints import Comparable
 
 
 class Node:
+    # Trees can hold a great many nodes; keep them small.
+    __slots__ = ("left", "right", "parent", "value", "height")
+
     def __init__(self, value: Comparable) -> None:
-        """A BST node.  Just a left and right reference along with a
-        value.  Note that value can be anything as long as it
+        """A BST node.  Just a left, right and parent reference along
+        with a value.  Note that value can be anything as long as it
         is :class:`Comparable` with other instances of itself.
 
         Args:
@@ -22,14 +26,137 @@ class Node:
         """
         self.left: Optional[Node] = None
         self.right: Optional[Node] = None
+        self.parent: Optional[Node] = None
         self.value: Comparable = value
 
+        # The height of the subtree rooted here (a leaf is 1).  Only
+        # maintained by self-balancing trees (see :class:`AVLTree`);
+        # a plain :class:`BinarySearchTree` never updates it, so the
+        # values :meth:`BinarySearchTree.from_sorted` leaves here go
+        # stale as soon as the tree is modified and must not be read.
+        self.height: int = 1
+
 
 class BinarySearchTree(object):
+    __slots__ = ("root", "count", "max_depth")
+
     def __init__(self):
         self.root = None
         self.count = 0
-        self.traverse = None
+
+        # The tree's depth, kept up to date by inserts so that depth()
+        # need not walk the whole tree.  Deletes may make the tree
+        # shallower so they set this to -1 and depth() recomputes it.
+        # Rotations also change it so self-balancing trees (see
+        # :class:`AVLTree`) ignore it and use their root's height.
+        self.max_depth = 0
+
+    @classmethod
+    def from_sorted(cls, values: Iterable[Comparable]) -> "BinarySearchTree":
+        """Build a tree holding values, which must already be in sorted
+        order, in :math:`O(n)` time.  Rather than inserting them one by
+        one (which, for sorted input, would produce a tree that is just
+        a linked list) this makes the middle value the root and builds
+        its subtrees out of the values on either side of it, and so on.
+        The result is as shallow as possible.
+
+        Args:
+            values: the (sorted) values with which to populate the tree.
+
+        Raises:
+            ValueError: values are not sorted.
+
+        >>> t = BinarySearchTree.from_sorted(range(1, 8))
+        >>> t
+        4
+        ├──2
+        │  ├──1
+        │  └──3
+        └──6
+           ├──5
+           └──7
+
+        >>> len(t)
+        7
+        >>> t.depth()
+        3
+
+        Duplicate values may end up on either side of each other but
+        are all still found:
+
+        >>> t = BinarySearchTree.from_sorted([1, 5, 5, 5, 9])
+        >>> [node.value for node in t.get_nodes_in_range_inclusive(5, 5)]
+        [5, 5, 5]
+        >>> del t[5]
+        >>> t.to_list_inorder()
+        [1, 5, 5, 9]
+
+        >>> BinarySearchTree.from_sorted([1, 3, 2])
+        Traceback (most recent call last):
+        ...
+        ValueError: Values must be sorted
+
+        """
+        values = list(values)
+        for n in range(1, len(values)):
+            if values[n] < values[n - 1]:
+                raise ValueError("Values must be sorted")
+
+        tree = cls()
+        if not values:
+            return tree
+
+        # Each entry is a half open range [lo, hi) of values whose
+        # middle becomes the root of a subtree hanging off of parent
+        # (on its left if is_left).
+        stack: List[Tuple[int, int, Optional[Node], bool]] = [
+            (0, len(values), None, False)
+        ]
+        while stack:
+            lo, hi, parent, is_left = stack.pop()
+            mid = (lo + hi) // 2
+            node = Node(values[mid])
+            node.parent = parent
+            node.height = (hi - lo).bit_length()
+            if parent is None:
+                tree.root = node
+            elif is_left:
+                parent.left = node
+            else:
+                parent.right = node
+            tree.count += 1
+            tree._on_insert(parent, node)
+            if mid + 1 < hi:
+                stack.append((mid + 1, hi, node, False))
+            if lo < mid:
+                stack.append((lo, mid, node, True))
+        tree.max_depth = tree.root.height
+        return tree
+
+    @classmethod
+    def from_iterable(cls, values: Iterable[Comparable]) -> "BinarySearchTree":
+        """Build a tree holding values (in any order) in
+        :math:`O(n log_2 n)` time by sorting them and then calling
+        :meth:`from_sorted`.  Unlike inserting the values one by one,
+        this always produces a tree that is as shallow as possible.
+
+        Args:
+            values: the values with which to populate the tree.
+
+        >>> t = BinarySearchTree.from_iterable([5, 1, 4, 2, 3])
+        >>> t
+        3
+        ├──2
+        │  └──1
+        └──5
+           └──4
+
+        >>> t = BinarySearchTree.from_iterable([5, 9, 5, 1, 5])
+        >>> [node.value for node in t.get_nodes_in_range_inclusive(5, 9)]
+        [5, 5, 5, 9]
+
+        """
+        return cls.from_sorted(sorted(values))
 
     def get_root(self) -> Optional[Node]:
         """
@@ -43,6 +170,13 @@ class BinarySearchTree(object):
         """This is called immediately _after_ a new node is inserted."""
         pass
 
+    def _rebalance_from(self, node: Optional[Node]) -> None:
+        """This is called after an insert or delete with the deepest
+        node whose subtree changed shape (or None if that was the
+        root).  The plain BST does not rebalance (or keep node
+        heights) so this does nothing; see :class:`AVLTree`."""
+        pass
+
     def insert(self, value: Comparable) -> None:
         """
         Insert something into the tree in :math:`O(log_2 n)` time.
@@ -64,26 +198,33 @@ class BinarySearchTree(object):
         if self.root is None:
             self.root = Node(value)
             self.count = 1
+            self.max_depth = 1
             self._on_insert(None, self.root)
         else:
             self._insert(value, self.root)
 
     def _insert(self, value: Comparable, node: Node):
-        """Insertion helper"""
-        if value < node.value:
-            if node.left is not None:
-                self._insert(value, node.left)
+        """Insertion helper; node is the root of the tree."""
+        depth = 2
+        while True:
+            if value < node.value:
+                child = node.left
+                if child is None:
+                    new = node.left = Node(value)
+                    break
             else:
-                node.left = Node(value)
-                self.count += 1
-                self._on_insert(node, node.left)
-        else:
-            if node.right is not None:
-                self._insert(value, node.right)
-            else:
-                node.right = Node(value)
-                self.count += 1
-                self._on_insert(node, node.right)
+                child = node.right
+                if child is None:
+                    new = node.right = Node(value)
+                    break
+            node = child
+            depth += 1
+        if self.max_depth != -1 and depth > self.max_depth:
+            self.max_depth = depth
+        new.parent = node
+        self.count += 1
+        self._on_insert(node, new)
+        self._rebalance_from(node)
 
     def __getitem__(self, value: Comparable) -> Optional[Node]:
         """
@@ -107,17 +248,24 @@ class BinarySearchTree(object):
             return self._find_exact(value, self.root)
         return None
 
-    def _find_exact(self, target: Comparable, node: Node) -> Optional[Node]:
-        """Recursively traverse the tree looking for a node with the
-        target value.  Return that node if it exists, otherwise return
-        None."""
-
-        if target == node.value:
-            return node
-        elif target < node.value and node.left is not None:
-            return self._find_exact(target, node.left)
-        elif target > node.value and node.right is not None:
-            return self._find_exact(target, node.right)
+    def _find_exact(self, target: Comparable, node: Optional[Node]) -> Optional[Node]:
+        """Traverse the tree looking for a node with the target value.
+        Return that node if it exists, otherwise return None.
+
+        Rather than testing for equality at every level, this makes a
+        single < comparison per level and remembers the last node it
+        went right from: the greatest value <= target.  At the bottom,
+        that's the target if the target is in the tree at all."""
+
+        candidate = None
+        while node is not None:
+            if target < node.value:
+                node = node.left
+            else:
+                candidate = node
+                node = node.right
+        if candidate is not None and not candidate.value < target:
+            return candidate
         return None
 
     def _find_lowest_node_less_than_or_equal_to(
@@ -163,22 +311,20 @@ class BinarySearchTree(object):
 
         """
 
-        if not node:
-            return None
-
-        if target == node.value:
-            return node
-
-        elif target > node.value:
-            if below := self._find_lowest_node_less_than_or_equal_to(
-                target, node.right
-            ):
-                return below
-            else:
+        # Each time we go right, the node we left is the best answer
+        # so far (it's less than target and anything closer to target
+        # is in its right subtree).
+        best: Optional[Node] = None
+        while node is not None:
+            node_value = node.value
+            if target == node_value:
                 return node
-
-        else:
-            return self._find_lowest_node_less_than_or_equal_to(target, node.left)
+            elif target > node_value:
+                best = node
+                node = node.right
+            else:
+                node = node.left
+        return best
 
     def _find_lowest_node_greater_than_or_equal_to(
         self, target: Comparable, node: Optional[Node]
@@ -223,41 +369,42 @@ class BinarySearchTree(object):
 
         """
 
-        if not node:
-            return None
-
-        if target == node.value:
-            return node
-
-        elif target > node.value:
-            return self._find_lowest_node_greater_than_or_equal_to(target, node.right)
-
-        # If target < this node's value, either this node is the
-        # answer or the answer is in this node's left subtree.
-        else:
-            if below := self._find_lowest_node_greater_than_or_equal_to(
-                target, node.left
-            ):
-                return below
+        # If target <= this node's value, either this node is the
+        # answer or the answer is in this node's left subtree.  Keep
+        # going left even on an equal value: with duplicates, rotations
+        # (and from_sorted) can leave equal values in the left subtree
+        # and this needs to find the first of them.
+        best: Optional[Node] = None
+        while node is not None:
+            if node.value < target:
+                node = node.right
             else:
-                return node
+                best = node
+                node = node.left
+        return best
 
-    def _parent_path(
-        self, current: Optional[Node], target: Node
-    ) -> List[Optional[Node]]:
-        """Internal helper"""
-        if current is None:
-            return [None]
-        ret: List[Optional[Node]] = [current]
-        if target.value == current.value:
-            return ret
-        elif target.value < current.value:
-            ret.extend(self._parent_path(current.left, target))
-            return ret
-        else:
-            assert target.value > current.value
-            ret.extend(self._parent_path(current.right, target))
-            return ret
+    def _find_with_path(
+        self, target: Comparable, node: Optional[Node]
+    ) -> Tuple[Optional[Node], List[Node]]:
+        """Like _find_exact but also returns the target's ancestors (or,
+        if it's not found, the nodes it would be beneath were it
+        inserted) in the same descent."""
+        path: List[Node] = []
+        candidate = None
+        candidate_depth = 0
+        while node is not None:
+            if target < node.value:
+                path.append(node)
+                node = node.left
+            else:
+                candidate = node
+                candidate_depth = len(path)
+                path.append(node)
+                node = node.right
+        if candidate is not None and not candidate.value < target:
+            del path[candidate_depth:]
+            return candidate, path
+        return None, path
 
     def parent_path(self, node: Node) -> List[Optional[Node]]:
         """Get a node's parent path in :math:`O(log_2 n)` time.
@@ -312,7 +459,10 @@ class BinarySearchTree(object):
         None
 
         """
-        return self._parent_path(self.root, node)
+        found, path = self._find_with_path(node.value, self.root)
+        ret: List[Optional[Node]] = list(path)
+        ret.append(found)
+        return ret
 
     def __delitem__(self, value: Comparable) -> bool:
         """
@@ -396,9 +546,10 @@ class BinarySearchTree(object):
 
         """
         if self.root is not None:
-            ret = self._delete(value, None, self.root)
+            ret = self._delete(value)
             if ret:
                 self.count -= 1
+                self.max_depth = -1
                 if self.count == 0:
                     self.root = None
             return ret
@@ -408,62 +559,51 @@ class BinarySearchTree(object):
         """This is called just after deleted was deleted from the tree"""
         pass
 
-    def _delete(self, value: Comparable, parent: Optional[Node], node: Node) -> bool:
-        """Delete helper"""
-        if node.value == value:
+    def _on_rotate(self, pivot: Node, old_root: Node) -> None:
+        """This is called just after a self-balancing tree (see
+        :class:`AVLTree`) rotates pivot up into old_root's place, making
+        old_root one of pivot's children.  Only these two nodes have
+        new subtrees."""
+        pass
 
-            # Deleting a leaf node
-            if node.left is None and node.right is None:
-                if parent is not None:
-                    if parent.left == node:
-                        parent.left = None
-                    else:
-                        assert parent.right == node
-                        parent.right = None
-                self._on_delete(parent, node)
-                return True
-
-            # Node only has a right.
-            elif node.left is None:
-                assert node.right is not None
-                if parent is not None:
-                    if parent.left == node:
-                        parent.left = node.right
-                    else:
-                        assert parent.right == node
-                        parent.right = node.right
-                self._on_delete(parent, node)
-                return True
-
-            # Node only has a left.
-            elif node.right is None:
-                assert node.left is not None
-                if parent is not None:
-                    if parent.left == node:
-                        parent.left = node.left
-                    else:
-                        assert parent.right == node
-                        parent.right = node.left
-                self._on_delete(parent, node)
-                return True
-
-            # Node has both a left and right; get the successor node
-            # to this one and put it here (deleting the successor's
-            # old node).  Because these operations are happening only
-            # in the subtree underneath of node, I'm still calling
-            # this delete an O(log_2 n) operation in the docs.
-            else:
-                assert node.left is not None and node.right is not None
-                successor = self.get_next_node(node)
-                assert successor is not None
-                node.value = successor.value
-                return self._delete(node.value, node, node.right)
-
-        elif value < node.value and node.left is not None:
-            return self._delete(value, node, node.left)
-        elif value > node.value and node.right is not None:
-            return self._delete(value, node, node.right)
-        return False
+    def _delete(self, value: Comparable) -> bool:
+        """Delete helper"""
+        node = self._find_exact(value, self.root)
+        if node is None:
+            return False
+
+        # Node has both a left and right; its successor is the leftmost
+        # node in its right subtree.  Move the successor's value here and
+        # then delete the successor's old node instead.  The successor
+        # has no left child so it's easy to splice out below.  Because
+        # these operations are happening only in the subtree underneath
+        # of node, I'm still calling this delete an O(log_2 n) operation
+        # in the docs.
+        if node.left is not None and node.right is not None:
+            successor = node.right
+            while successor.left is not None:
+                successor = successor.left
+            node.value = successor.value
+            node = successor
+
+        # Now node has at most one child; splice it out by pointing its
+        # parent at that child (or None for a leaf).
+        if node.left is not None:
+            child = node.left
+        else:
+            child = node.right
+        parent = node.parent
+        if child is not None:
+            child.parent = parent
+        if parent is None:
+            self.root = child
+        elif parent.left is node:
+            parent.left = child
+        else:
+            parent.right = child
+        self._on_delete(parent, node)
+        self._rebalance_from(parent)
+        return True
 
     def __len__(self):
         """
@@ -496,29 +636,73 @@ class BinarySearchTree(object):
         """
         Returns:
             True if the item is in the tree; False otherwise.
-        """
-        return self.__getitem__(value) is not None
-
-    def _iterate_preorder(self, node: Node):
-        yield node.value
-        if node.left is not None:
-            yield from self._iterate_preorder(node.left)
-        if node.right is not None:
-            yield from self._iterate_preorder(node.right)
 
-    def _iterate_inorder(self, node: Node):
-        if node.left is not None:
-            yield from self._iterate_inorder(node.left)
-        yield node.value
-        if node.right is not None:
-            yield from self._iterate_inorder(node.right)
-
-    def _iterate_postorder(self, node: Node):
-        if node.left is not None:
-            yield from self._iterate_postorder(node.left)
-        if node.right is not None:
-            yield from self._iterate_postorder(node.right)
-        yield node.value
+        >>> t = BinarySearchTree()
+        >>> 10 in t
+        False
+        >>> t.insert(10)
+        >>> t.insert(5)
+        >>> 5 in t
+        True
+        >>> 6 in t
+        False
+        """
+        # This is _find_exact inlined since membership tests are common.
+        node = self.root
+        candidate = None
+        while node is not None:
+            if value < node.value:
+                node = node.left
+            else:
+                candidate = node
+                node = node.right
+        return candidate is not None and not candidate.value < value
+
+    def _iterate_preorder(self, node: Optional[Node]):
+        stack = [node] if node is not None else []
+        while stack:
+            node = stack.pop()
+            yield node.value
+            if node.right is not None:
+                stack.append(node.right)
+            if node.left is not None:
+                stack.append(node.left)
+
+    def _iterate_inorder(self, node: Optional[Node]):
+        # Follow child and parent links rather than keeping a stack (or,
+        # like a Morris traversal, temporarily rewiring the tree, which
+        # isn't safe in a generator that may be abandoned midway).
+        # Note: because this climbs parent links, node must be the root.
+        if node is None:
+            return
+        while node.left is not None:
+            node = node.left
+        while node is not None:
+            yield node.value
+            if node.right is not None:
+                node = node.right
+                while node.left is not None:
+                    node = node.left
+            else:
+                parent = node.parent
+                while parent is not None and node is parent.right:
+                    node = parent
+                    parent = node.parent
+                node = parent
+
+    def _iterate_postorder(self, node: Optional[Node]):
+        stack: List[Node] = []
+        last: Optional[Node] = None
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            top = stack[-1]
+            if top.right is not None and top.right is not last:
+                node = top.right
+            else:
+                yield top.value
+                last = stack.pop()
 
     def iterate_preorder(self):
         """
@@ -544,8 +728,7 @@ class BinarySearchTree(object):
         66
 
         """
-        if self.root is not None:
-            yield from self._iterate_preorder(self.root)
+        return self._iterate_preorder(self.root)
 
     def iterate_inorder(self):
         """
@@ -581,8 +764,57 @@ class BinarySearchTree(object):
         75
 
         """
-        if self.root is not None:
-            yield from self._iterate_inorder(self.root)
+        return self._iterate_inorder(self.root)
+
+    def to_list_inorder(self) -> List[Comparable]:
+        """
+        Returns:
+            A list of the tree's items in sorted (inorder) order.  This
+            is faster than list(t.iterate_inorder()) since it doesn't
+            have to resume a generator for each item.
+
+        >>> t = BinarySearchTree()
+        >>> t.to_list_inorder()
+        []
+        >>> for x in (50, 75, 25, 66, 22):
+        ...     t.insert(x)
+        >>> t.to_list_inorder()
+        [22, 25, 50, 66, 75]
+
+        """
+        ret: List[Comparable] = []
+        append = ret.append
+        stack: List[Node] = []
+        node = self.root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            append(node.value)
+            node = node.right
+        return ret
+
+    def to_array_inorder(self, typecode: str) -> array.array:
+        """
+        Args:
+            typecode: the :mod:`array` typecode of the values in the
+                tree (e.g. "q" for 64 bit ints or "d" for floats).
+
+        Returns:
+            The tree's items in sorted (inorder) order packed into a
+            contiguous :class:`array.array`.  Anything that speaks the
+            buffer protocol (e.g. numpy.frombuffer) can use it without
+            copying.
+
+        >>> t = BinarySearchTree()
+        >>> for x in (5.5, 1.25, 3.0):
+        ...     t.insert(x)
+        >>> t.to_array_inorder("d")
+        array('d', [1.25, 3.0, 5.5])
+
+        """
+        return array.array(typecode, self.to_list_inorder())
 
     def iterate_postorder(self):
         """
@@ -608,16 +840,19 @@ class BinarySearchTree(object):
         50
 
         """
-        if self.root is not None:
-            yield from self._iterate_postorder(self.root)
+        return self._iterate_postorder(self.root)
 
-    def _iterate_leaves(self, node: Node):
-        if node.left is not None:
-            yield from self._iterate_leaves(node.left)
-        if node.right is not None:
-            yield from self._iterate_leaves(node.right)
-        if node.left is None and node.right is None:
-            yield node.value
+    def _iterate_leaves(self, node: Optional[Node]):
+        stack = [node] if node is not None else []
+        while stack:
+            node = stack.pop()
+            if node.left is None and node.right is None:
+                yield node.value
+            else:
+                if node.right is not None:
+                    stack.append(node.right)
+                if node.left is not None:
+                    stack.append(node.left)
 
     def iterate_leaves(self):
         """
@@ -639,18 +874,16 @@ class BinarySearchTree(object):
         66
 
         """
-        if self.root is not None:
-            yield from self._iterate_leaves(self.root)
+        return self._iterate_leaves(self.root)
 
-    def _iterate_by_depth(self, node: Node, depth: int):
-        if depth == 0:
-            yield node.value
-        else:
-            assert depth > 0
-            if node.left is not None:
-                yield from self._iterate_by_depth(node.left, depth - 1)
-            if node.right is not None:
-                yield from self._iterate_by_depth(node.right, depth - 1)
+    def _iterate_by_depth(self, node: Optional[Node], depth: int):
+        # Build each level of the tree from the one above it until we
+        # reach the requested depth.
+        level = [node] if node is not None and depth >= 0 else []
+        for _ in range(depth):
+            level = [c for n in level for c in (n.left, n.right) if c is not None]
+        for n in level:
+            yield n.value
 
     def iterate_nodes_by_depth(self, depth: int) -> Generator[Node, None, None]:
         """
@@ -679,8 +912,7 @@ class BinarySearchTree(object):
         13
 
         """
-        if self.root is not None:
-            yield from self._iterate_by_depth(self.root, depth)
+        return self._iterate_by_depth(self.root, depth)
 
     def get_next_node(self, node: Node) -> Optional[Node]:
         """
@@ -688,8 +920,10 @@ class BinarySearchTree(object):
             node: the node whose next greater successor is desired
 
         Returns:
-            Given a tree node, returns the next greater node in the tree.
-            If the given node is the greatest node in the tree, returns None.
+            Given a tree node, returns the next greater node in the tree
+            in :math:`O(log_2 n)` time by following child and parent
+            links.  If the given node is the greatest node in the tree,
+            returns None.
 
         >>> t = BinarySearchTree()
         >>> t.insert(50)
@@ -727,17 +961,12 @@ class BinarySearchTree(object):
                 x = x.left
             return x
 
-        path = self.parent_path(node)
-        assert path[-1] is not None
-        assert path[-1] == node
-        path = path[:-1]
-        path.reverse()
-        for ancestor in path:
-            assert ancestor is not None
-            if node != ancestor.right:
-                return ancestor
-            node = ancestor
-        return None
+        # Otherwise it's the first ancestor whose left subtree we're in.
+        parent = node.parent
+        while parent is not None and node is parent.right:
+            node = parent
+            parent = node.parent
+        return parent
 
     def get_nodes_in_range_inclusive(
         self, lower: Comparable, upper: Comparable
@@ -774,29 +1003,35 @@ class BinarySearchTree(object):
         25
         50
         66
+
+        Duplicate values are all included, whatever the tree's shape:
+
+        >>> t = AVLTree()
+        >>> for x in (5, 5, 5):
+        ...     t.insert(x)
+        >>> [node.value for node in t.get_nodes_in_range_inclusive(5, 5)]
+        [5, 5, 5]
         """
         node: Optional[Node] = self._find_lowest_node_greater_than_or_equal_to(
             lower, self.root
         )
-        while node:
-            if lower <= node.value <= upper:
-                yield node
+        # Nodes come out of get_next_node in order and the first is
+        # already >= lower, so stop at the first one past upper rather
+        # than walking the rest of the tree.
+        while node is not None:
+            if upper < node.value:
+                return
+            yield node
             node = self.get_next_node(node)
 
-    def _depth(self, node: Node, sofar: int) -> int:
-        depth_left = sofar + 1
-        depth_right = sofar + 1
-        if node.left is not None:
-            depth_left = self._depth(node.left, sofar + 1)
-        if node.right is not None:
-            depth_right = self._depth(node.right, sofar + 1)
-        return max(depth_left, depth_right)
-
     def depth(self) -> int:
         """
         Returns:
             The max height (depth) of the tree in plies (edge distance
-            from root) in :math:`O(log_2 n)` time.
+            from root).  This is :math:`O(1)` unless something was
+            deleted since the last call, in which case it walks the
+            whole tree in :math:`O(n)` time.  :meth:`AVLTree.depth` is
+            always :math:`O(1)`.
 
         >>> t = BinarySearchTree()
         >>> t.depth()
@@ -819,10 +1054,20 @@ class BinarySearchTree(object):
         >>> t.depth()
         4
 
+        >>> del t[2]
+        >>> t.depth()
+        3
+
         """
-        if self.root is None:
-            return 0
-        return self._depth(self.root, 0)
+        if self.max_depth != -1:
+            return self.max_depth
+        depth = 0
+        level = [self.root] if self.root is not None else []
+        while level:
+            depth += 1
+            level = [c for n in level for c in (n.left, n.right) if c is not None]
+        self.max_depth = depth
+        return depth
 
     def height(self) -> int:
         """Returns the height (i.e. max depth) of the tree"""
@@ -835,8 +1080,24 @@ class BinarySearchTree(object):
         node: Optional[Node],
         has_right_sibling: bool,
     ) -> str:
-        if node is not None:
-            viz = f"\n{padding}{pointer}{node.value}"
+        parts: List[str] = []
+        self._repr_traverse(parts, [(padding, pointer, node, has_right_sibling)])
+        return "".join(parts)
+
+    def _repr_traverse(
+        self,
+        parts: List[str],
+        stack: List[Tuple[str, str, Optional[Node], bool]],
+    ) -> None:
+        """Pops (padding, pointer, node, has_right_sibling) tuples off
+        of stack and appends the lines that draw each one's subtree to
+        parts, pushing its children as it goes (right first, so that
+        the left subtree is drawn first)."""
+        while stack:
+            padding, pointer, node, has_right_sibling = stack.pop()
+            if node is None:
+                continue
+            parts.append(f"\n{padding}{pointer}{node.value}")
             if has_right_sibling:
                 padding += "│  "
             else:
@@ -848,12 +1109,8 @@ class BinarySearchTree(object):
             else:
                 pointer_left = "└──"
 
-            viz += self.repr_traverse(
-                padding, pointer_left, node.left, node.right is not None
-            )
-            viz += self.repr_traverse(padding, pointer_right, node.right, False)
-            return viz
-        return ""
+            stack.append((padding, pointer_right, node.right, False))
+            stack.append((padding, pointer_left, node.left, node.right is not None))
 
     def __repr__(self):
         """
@@ -880,18 +1137,352 @@ class BinarySearchTree(object):
         if self.root is None:
             return ""
 
-        ret = f"{self.root.value}"
+        parts = [f"{self.root.value}"]
         pointer_right = "└──"
         if self.root.right is None:
             pointer_left = "└──"
         else:
             pointer_left = "├──"
 
-        ret += self.repr_traverse(
-            "", pointer_left, self.root.left, self.root.left is not None
+        self._repr_traverse(
+            parts,
+            [
+                ("", pointer_right, self.root.right, False),
+                ("", pointer_left, self.root.left, self.root.left is not None),
+            ],
         )
-        ret += self.repr_traverse("", pointer_right, self.root.right, False)
-        return ret
+        return "".join(parts)
+
+
+class AVLTree(BinarySearchTree):
+    """A :class:`BinarySearchTree` that keeps itself balanced by
+    performing AVL rotations (see:
+    https://en.wikipedia.org/wiki/AVL_tree) as values are inserted
+    and deleted.  Thus its depth stays below :math:`1.44 log_2 n`
+    even when values are inserted in sorted order, which would turn
+    a plain :class:`BinarySearchTree` into a linked list.
+
+    >>> t = AVLTree()
+    >>> for x in range(1, 8):
+    ...     t.insert(x)
+    >>> t
+    4
+    ├──2
+    │  ├──1
+    │  └──3
+    └──6
+       ├──5
+       └──7
+
+    >>> t.depth()
+    3
+
+    >>> del t[1]
+    >>> del t[3]
+    >>> del t[2]
+    >>> t
+    6
+    ├──4
+    │  └──5
+    └──7
+
+    >>> for value in t.iterate_inorder():
+    ...     print(value)
+    4
+    5
+    6
+    7
+
+    """
+
+    __slots__ = ()
+
+    @staticmethod
+    def _height(node: Optional[Node]) -> int:
+        if node is None:
+            return 0
+        return node.height
+
+    def _rotate_left(self, node: Node) -> Node:
+        """Rotate node's right child up into its place and return it."""
+        pivot = node.right
+        assert pivot is not None
+        child = node.right = pivot.left
+        if child is not None:
+            child.parent = node
+        pivot.left = node
+        pivot.parent = node.parent
+        node.parent = pivot
+        lh = node.left.height if node.left is not None else 0
+        rh = child.height if child is not None else 0
+        node.height = 1 + (lh if lh > rh else rh)
+        rh = pivot.right.height if pivot.right is not None else 0
+        pivot.height = 1 + (node.height if node.height > rh else rh)
+        self._on_rotate(pivot, node)
+        return pivot
+
+    def _rotate_right(self, node: Node) -> Node:
+        """Rotate node's left child up into its place and return it."""
+        pivot = node.left
+        assert pivot is not None
+        child = node.left = pivot.right
+        if child is not None:
+            child.parent = node
+        pivot.right = node
+        pivot.parent = node.parent
+        node.parent = pivot
+        lh = child.height if child is not None else 0
+        rh = node.right.height if node.right is not None else 0
+        node.height = 1 + (lh if lh > rh else rh)
+        lh = pivot.left.height if pivot.left is not None else 0
+        pivot.height = 1 + (lh if lh > node.height else node.height)
+        self._on_rotate(pivot, node)
+        return pivot
+
+    def _rebalance_from(self, node: Optional[Node]) -> None:
+        """Climb from node towards the root updating heights and
+        rotating any node that's out of balance.  Ancestors only care
+        about the height of the subtree beneath them so once that
+        stops changing the rest of the climb can be skipped."""
+        while node is not None:
+            parent = node.parent
+            old_height = node.height
+            left = node.left
+            right = node.right
+            lh = left.height if left is not None else 0
+            rh = right.height if right is not None else 0
+            if lh - rh > 1:
+                assert left is not None
+                if self._height(left.left) < self._height(left.right):
+                    node.left = self._rotate_left(left)
+                top = self._rotate_right(node)
+            elif rh - lh > 1:
+                assert right is not None
+                if self._height(right.right) < self._height(right.left):
+                    node.right = self._rotate_right(right)
+                top = self._rotate_left(node)
+            else:
+                height = 1 + (lh if lh > rh else rh)
+                if height == old_height:
+                    return
+                node.height = height
+                node = parent
+                continue
+
+            # A rotation put top where node was; link it to parent.
+            if parent is None:
+                self.root = top
+            elif parent.left is node:
+                parent.left = top
+            else:
+                parent.right = top
+            if top.height == old_height:
+                return
+            node = parent
+
+    def depth(self) -> int:
+        """Returns the max depth of the tree in plies in :math:`O(1)`
+        time since an AVLTree keeps its nodes' heights."""
+        if self.root is None:
+            return 0
+        return self.root.height
+
+
+class IntBinarySearchTree(object):
+    """A (non-balancing) binary search tree specialized for ints.
+    Rather than allocating a :class:`Node` object per value, it keeps
+    its values and child links in three parallel :mod:`array` columns
+    indexed by node number (with -1 meaning "no child").  This takes
+    a small fraction of the memory of a :class:`BinarySearchTree`
+    holding the same values and keeps them contiguous.  Values must
+    fit in a signed 64 bit int.
+
+    >>> t = IntBinarySearchTree()
+    >>> for x in (50, 75, 25, 66, 22, 13, 85):
+    ...     t.insert(x)
+    >>> len(t)
+    7
+    >>> 66 in t
+    True
+    >>> 67 in t
+    False
+    >>> t.depth()
+    4
+
+    >>> list(t.iterate_inorder())
+    [13, 22, 25, 50, 66, 75, 85]
+
+    >>> t.__delitem__(50)
+    True
+    >>> t.__delitem__(51)
+    False
+    >>> del t[13]
+    >>> list(t)
+    [22, 25, 66, 75, 85]
+    >>> len(t)
+    5
+
+    """
+
+    __slots__ = ("values", "left", "right", "root", "count", "free", "max_depth")
+
+    def __init__(self):
+        self.values = array.array("q")
+        self.left = array.array("q")
+        self.right = array.array("q")
+        self.root = -1
+        self.count = 0
+
+        # Indexes of the slots in the columns above that were freed
+        # by deletes and can be reused by inserts.
+        self.free: List[int] = []
+
+        # The tree's depth, kept up to date by inserts so that depth()
+        # need not walk the whole tree.  Deletes may make the tree
+        # shallower so they set this to -1 and depth() recomputes it.
+        self.max_depth = 0
+
+    def _new_node(self, value: int) -> int:
+        if self.free:
+            n = self.free.pop()
+            self.values[n] = value
+            self.left[n] = -1
+            self.right[n] = -1
+        else:
+            n = len(self.values)
+            self.values.append(value)
+            self.left.append(-1)
+            self.right.append(-1)
+        return n
+
+    def insert(self, value: int) -> None:
+        """Insert value into the tree in :math:`O(log_2 n)` time (if
+        the tree is balanced)."""
+        new = self._new_node(value)
+        self.count += 1
+        if self.root == -1:
+            self.root = new
+            self.max_depth = 1
+            return
+        values, left, right = self.values, self.left, self.right
+        n = self.root
+        depth = 2
+        while True:
+            if value < values[n]:
+                if left[n] == -1:
+                    left[n] = new
+                    break
+                n = left[n]
+            else:
+                if right[n] == -1:
+                    right[n] = new
+                    break
+                n = right[n]
+            depth += 1
+        if self.max_depth != -1 and depth > self.max_depth:
+            self.max_depth = depth
+
+    def _find(self, value: int) -> int:
+        values, left, right = self.values, self.left, self.right
+        n = self.root
+        while n != -1:
+            v = values[n]
+            if value == v:
+                return n
+            n = left[n] if value < v else right[n]
+        return -1
+
+    def __contains__(self, value: int) -> bool:
+        return self._find(value) != -1
+
+    def __delitem__(self, value: int) -> bool:
+        """Delete value from the tree, if present.  Returns True if it
+        was found and False otherwise."""
+        values, left, right = self.values, self.left, self.right
+        parent = -1
+        n = self.root
+        while n != -1:
+            v = values[n]
+            if value == v:
+                break
+            parent = n
+            n = left[n] if value < v else right[n]
+        else:
+            return False
+
+        # Two children: overwrite this node's value with that of its
+        # successor (the leftmost node in its right subtree) and
+        # delete the successor's node instead.
+        if left[n] != -1 and right[n] != -1:
+            parent = n
+            successor = right[n]
+            while left[successor] != -1:
+                parent = successor
+                successor = left[successor]
+            values[n] = values[successor]
+            n = successor
+
+        # Now n has at most one child; splice it out.
+        child = left[n] if left[n] != -1 else right[n]
+        if parent == -1:
+            self.root = child
+        elif left[parent] == n:
+            left[parent] = child
+        else:
+            right[parent] = child
+        self.free.append(n)
+        self.count -= 1
+        self.max_depth = -1
+        return True
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Generator[int, None, None]:
+        return self.iterate_inorder()
+
+    def iterate_inorder(self) -> Generator[int, None, None]:
+        """Yields the values in the tree in sorted order."""
+        values, left, right = self.values, self.left, self.right
+        stack: List[int] = []
+        n = self.root
+        while stack or n != -1:
+            while n != -1:
+                stack.append(n)
+                n = left[n]
+            n = stack.pop()
+            yield values[n]
+            n = right[n]
+
+    def depth(self) -> int:
+        """Returns the max depth of the tree in plies (the number of
+        nodes on the longest path from the root to a leaf).  This is
+        :math:`O(1)` unless something was deleted since the last call.
+
+        >>> t = IntBinarySearchTree()
+        >>> t.depth()
+        0
+        >>> for x in (2, 1, 3, 4):
+        ...     t.insert(x)
+        >>> t.depth()
+        3
+        >>> del t[4]
+        >>> t.depth()
+        2
+        >>> t.insert(5)
+        >>> t.depth()
+        3
+        """
+        if self.max_depth != -1:
+            return self.max_depth
+        left, right = self.left, self.right
+        depth = 0
+        level = [self.root] if self.root != -1 else []
+        while level:
+            depth += 1
+            level = [c for n in level for c in (left[n], right[n]) if c != -1]
+        self.max_depth = depth
+        return depth
 
 
 if __name__ == "__main__":
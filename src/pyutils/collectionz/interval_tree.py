@@ -8,8 +8,7 @@ described by: https://en.wikipedia.org/wiki/Interval_tree.
 
 from __future__ import annotations
 
-from functools import total_ordering
-from typing import Any, Generator, Optional
+from typing import Any, Generator, Iterable, List, Optional, Sequence
 
 from overrides import overrides
 
@@ -17,11 +16,13 @@ from pyutils.collectionz import bst
 from pyutils.typez.type_hints import Numeric
 
 
-@total_ordering
 class NumericRange(bst.Comparable):
     """Essentially a tuple of numbers denoting a range with some added
     helper methods on it."""
 
+    # Interval trees can hold a great many of these.
+    __slots__ = ("low", "high", "highest_in_subtree")
+
     def __init__(self, low: Numeric, high: Numeric):
         """Creates a NumericRange.
 
@@ -41,16 +42,26 @@ class NumericRange(bst.Comparable):
         self.high: Numeric = high
         self.highest_in_subtree: Numeric = high
 
+    # The tree compares ranges a lot so all six comparison operators
+    # are written out here rather than derived by functools.total_ordering,
+    # whose generated methods cost an extra call (or two) per comparison.
+
     @overrides
     def __lt__(self, other: NumericRange) -> bool:
         """
         Returns:
             True is this range is less than (lower low) other, else False.
+
+        >>> NumericRange(1, 5) < NumericRange(2, 3)
+        True
+        >>> NumericRange(1, 5) < NumericRange(1, 6)
+        True
+        >>> NumericRange(1, 5) < NumericRange(1, 5)
+        False
         """
         if self.low != other.low:
             return self.low < other.low
-        else:
-            return self.high < other.high
+        return self.high < other.high
 
     @overrides
     def __eq__(self, other: object) -> bool:
@@ -62,11 +73,60 @@ class NumericRange(bst.Comparable):
             return False
         return self.low == other.low and self.high == other.high
 
+    def __hash__(self) -> int:
+        """Ranges hash by their endpoints (but not highest_in_subtree,
+        which is tree bookkeeping) so they can be used as dict keys and
+        set members.  Don't change low or high while a range is in a
+        dict or set (or a tree).
+
+        >>> len({NumericRange(1, 5), NumericRange(5, 1), NumericRange(2, 3)})
+        2
+        """
+        return hash((self.low, self.high))
+
+    @overrides
+    def __ne__(self, other: object) -> bool:
+        if not isinstance(other, NumericRange):
+            return True
+        return self.low != other.low or self.high != other.high
+
     @overrides
     def __le__(self, other: object) -> bool:
+        """
+        >>> NumericRange(1, 5) <= NumericRange(1, 5)
+        True
+        >>> NumericRange(2, 3) <= NumericRange(1, 5)
+        False
+        """
         if not isinstance(other, NumericRange):
             return False
-        return self < other or self == other
+        if self.low != other.low:
+            return self.low < other.low
+        return self.high <= other.high
+
+    @overrides
+    def __gt__(self, other: NumericRange) -> bool:
+        """
+        >>> NumericRange(2, 3) > NumericRange(1, 5)
+        True
+        >>> NumericRange(1, 5) > NumericRange(1, 5)
+        False
+        """
+        if self.low != other.low:
+            return self.low > other.low
+        return self.high > other.high
+
+    @overrides
+    def __ge__(self, other: NumericRange) -> bool:
+        """
+        >>> NumericRange(1, 6) >= NumericRange(1, 5)
+        True
+        >>> NumericRange(1, 4) >= NumericRange(1, 5)
+        False
+        """
+        if self.low != other.low:
+            return self.low > other.low
+        return self.high >= other.high
 
     def overlaps_with(self, other: NumericRange) -> bool:
         """
@@ -79,7 +139,26 @@ class NumericRange(bst.Comparable):
         return f"[{self.low}..{self.high}]"
 
 
-class AugmentedIntervalTree(bst.BinarySearchTree):
+class AugmentedIntervalTree(bst.AVLTree):
+    """An interval tree that stores :class:`NumericRange` values.  Each
+    range also records the highest point in its subtree, which lets
+    overlap searches skip whole subtrees.  It is built on
+    :class:`pyutils.collectionz.bst.AVLTree` so it stays balanced
+    even when ranges are inserted in sorted order.
+
+    >>> tree = AugmentedIntervalTree()
+    >>> for x in range(10):
+    ...     tree.insert(NumericRange(x, x + 2))
+    >>> tree.depth()
+    4
+    >>> tree.find_one_overlap(NumericRange(11, 20))
+    [9..11]
+    """
+
+    __slots__ = ()
+
+    # Every value goes through _on_insert, which checks that it's a
+    # NumericRange, so nothing else re-checks the values in the tree.
     @staticmethod
     def _assert_value_must_be_range(value: Any) -> NumericRange:
         if not isinstance(value, NumericRange):
@@ -89,35 +168,83 @@ class AugmentedIntervalTree(bst.BinarySearchTree):
             )
         return value
 
+    @classmethod
+    @overrides
+    def from_iterable(cls, values: Iterable[NumericRange]) -> AugmentedIntervalTree:
+        """Build a balanced tree holding ranges (in any order).  Use
+        this rather than inserting many ranges one at a time.
+
+        Args:
+            values: the ranges with which to populate the tree.
+
+        >>> tree = AugmentedIntervalTree.from_iterable(
+        ...     NumericRange(low, low + 3) for low in (9, 2, 5, 1, 7)
+        ... )
+        >>> tree
+        [5..8]
+        ├──[2..5]
+        │  └──[1..4]
+        └──[9..12]
+           └──[7..10]
+        >>> tree.find_one_overlap(NumericRange(11, 11))
+        [9..12]
+
+        """
+        # Sort on a tuple key rather than with NumericRange.__lt__:
+        # tuples compare in C, which halves the cost of the sort.
+        ranges = [AugmentedIntervalTree._assert_value_must_be_range(v) for v in values]
+        ranges.sort(key=lambda r: (r.low, r.high))
+        tree = cls.from_sorted(ranges)
+        assert isinstance(tree, AugmentedIntervalTree)
+        return tree
+
+    @staticmethod
+    def _update_highest_in_subtree(node: bst.Node) -> None:
+        """Recompute node's highest_in_subtree from its own range and
+        its children's (already correct) highest_in_subtree."""
+        nv: NumericRange = node.value
+        highest = nv.high
+        left = node.left
+        if left is not None and left.value.highest_in_subtree > highest:
+            highest = left.value.highest_in_subtree
+        right = node.right
+        if right is not None and right.value.highest_in_subtree > highest:
+            highest = right.value.highest_in_subtree
+        nv.highest_in_subtree = highest
+
     @overrides
     def _on_insert(self, parent: Optional[bst.Node], new: bst.Node) -> None:
         nv: NumericRange = AugmentedIntervalTree._assert_value_must_be_range(new.value)
-        for ancestor in self.parent_path(new):
-            assert ancestor
-            av: NumericRange = AugmentedIntervalTree._assert_value_must_be_range(
-                ancestor.value
-            )
-            if nv.high > av.highest_in_subtree:
-                av.highest_in_subtree = nv.high
+
+        # The range may have been in a tree before; forget that.
+        nv.highest_in_subtree = nv.high
+
+        # highest_in_subtree never decreases on the way up to the root
+        # so once an ancestor already covers nv.high, so do the rest.
+        ancestor = parent
+        while ancestor:
+            av: NumericRange = ancestor.value
+            if nv.high <= av.highest_in_subtree:
+                break
+            av.highest_in_subtree = nv.high
+            ancestor = ancestor.parent
 
     @overrides
     def _on_delete(self, parent: Optional[bst.Node], deleted: bst.Node) -> None:
-        if parent:
-            pv: NumericRange = AugmentedIntervalTree._assert_value_must_be_range(
-                parent.value
-            )
-            new_highest_candidates = [pv.high]
-            if parent.left:
-                lv: NumericRange = AugmentedIntervalTree._assert_value_must_be_range(
-                    parent.left.value
-                )
-                new_highest_candidates.append(lv.highest_in_subtree)
-            if parent.right:
-                rv: NumericRange = AugmentedIntervalTree._assert_value_must_be_range(
-                    parent.right.value
-                )
-                new_highest_candidates.append(rv.highest_in_subtree)
-            pv.highest_in_subtree = max(new_highest_candidates)
+        # Recompute highest_in_subtree for every ancestor of the deleted
+        # node, not just its parent: removing a range can lower it all
+        # the way up.  Also, when the deleted value had two children,
+        # the tree moved its successor's value (with a stale
+        # highest_in_subtree) into its node, which is on this path.
+        while parent:
+            AugmentedIntervalTree._update_highest_in_subtree(parent)
+            parent = parent.parent
+
+    @overrides
+    def _on_rotate(self, pivot: bst.Node, old_root: bst.Node) -> None:
+        # old_root is now pivot's child so fix it first.
+        AugmentedIntervalTree._update_highest_in_subtree(old_root)
+        AugmentedIntervalTree._update_highest_in_subtree(pivot)
 
     def find_one_overlap(self, to_find: NumericRange) -> Optional[NumericRange]:
         """Identify and return one overlapping node from the tree.
@@ -142,28 +269,35 @@ class AugmentedIntervalTree(bst.BinarySearchTree):
         >>> tree.insert(NumericRange(16, 28))
         >>> tree.insert(NumericRange(21, 27))
         >>> tree.find_one_overlap(NumericRange(6, 7))
-        [1..30]
+        [5..12]
+
+        >>> tree = AugmentedIntervalTree()
+        >>> for low, high in ((22, 25), (10, 29), (16, 26), (4, 4), (11, 23)):
+        ...     tree.insert(NumericRange(low, high))
+        >>> del tree[NumericRange(10, 29)]
+        >>> tree.find_one_overlap(NumericRange(26, 26))
+        [16..26]
 
         """
         return self._find_one_overlap(self.root, to_find)
 
     def _find_one_overlap(
-        self, root: bst.Node, x: NumericRange
+        self, root: Optional[bst.Node], x: NumericRange
     ) -> Optional[NumericRange]:
-        if root is None:
-            return None
-
-        rv = AugmentedIntervalTree._assert_value_must_be_range(root.value)
-        if rv.overlaps_with(x):
-            return rv
-
-        if root.left:
-            lv = AugmentedIntervalTree._assert_value_must_be_range(root.left.value)
-            if lv.highest_in_subtree >= x.low:
-                return self._find_one_overlap(root.left, x)
-
-        if root.right:
-            return self._find_one_overlap(root.right, x)
+        # This only ever descends into one child so it needs no stack.
+        xlow = x.low
+        xhigh = x.high
+        while root is not None:
+            rv = root.value
+            if rv.low <= xhigh and rv.high >= xlow:
+                return rv
+
+            left = root.left
+            if left is not None:
+                if left.value.highest_in_subtree >= xlow:
+                    root = left
+                    continue
+            root = root.right
         return None
 
     def find_all_overlaps(
@@ -193,18 +327,18 @@ class AugmentedIntervalTree(bst.BinarySearchTree):
         >>> tree.insert(NumericRange(21, 27))
         >>> for x in tree.find_all_overlaps(NumericRange(19, 21)):
         ...     print(x)
-        [20..24]
         [18..22]
         [1..30]
         [16..28]
+        [20..24]
         [21..27]
 
         >>> del tree[NumericRange(1, 30)]
         >>> for x in tree.find_all_overlaps(NumericRange(19, 21)):
         ...     print(x)
-        [20..24]
         [18..22]
         [16..28]
+        [20..24]
         [21..27]
 
         """
@@ -213,24 +347,95 @@ class AugmentedIntervalTree(bst.BinarySearchTree):
         yield from self._find_all_overlaps(self.root, to_find)
 
     def _find_all_overlaps(
-        self, root: bst.Node, x: NumericRange
+        self, root: Optional[bst.Node], x: NumericRange
     ) -> Generator[NumericRange, None, None]:
-        if root is None:
-            return None
-
-        rv = AugmentedIntervalTree._assert_value_must_be_range(root.value)
-        if rv.overlaps_with(x):
-            yield rv
-
-        if root.left:
-            lv = AugmentedIntervalTree._assert_value_must_be_range(root.left.value)
-            if lv.highest_in_subtree >= x.low:
-                yield from self._find_all_overlaps(root.left, x)
-
-        if root.right:
-            rv = AugmentedIntervalTree._assert_value_must_be_range(root.right.value)
-            if rv.highest_in_subtree >= x.low:
-                yield from self._find_all_overlaps(root.right, x)
+        # A single generator with its own stack of nodes still to
+        # visit rather than one generator (and yield from) per node.
+        xlow = x.low
+        xhigh = x.high
+        stack = []
+        if root is not None:
+            stack.append(root)
+        while stack:
+            node = stack.pop()
+
+            # Same test as NumericRange.overlaps_with, inlined because
+            # this runs once per visited node.
+            rv = node.value
+            if rv.low <= xhigh and rv.high >= xlow:
+                yield rv
+
+            # Everything to the right starts at or above rv.low so
+            # there's no need to look there if that's above xhigh.
+            # Push right before left so that left is visited first.
+            right = node.right
+            if right is not None and rv.low <= xhigh:
+                if right.value.highest_in_subtree >= xlow:
+                    stack.append(right)
+            left = node.left
+            if left is not None and left.value.highest_in_subtree >= xlow:
+                stack.append(left)
+
+    def find_all_overlaps_many(
+        self, queries: Sequence[NumericRange]
+    ) -> List[List[NumericRange]]:
+        """Find the overlaps for a whole batch of ranges at once.  This
+        gives the same answers as calling :meth:`find_all_overlaps`
+        once per query but walks the tree only once, carrying along
+        the queries that could still match in each subtree.  For large
+        batches that is several times faster than separate searches.
+
+        Args:
+            queries: the intervals with which to find all overlaps.
+
+        Returns:
+            A list with one entry per query (in the same order as
+            queries), each a (potentially empty) list of the ranges in
+            the tree that overlap that query.
+
+        >>> tree = AugmentedIntervalTree()
+        >>> for low, high in ((20, 24), (18, 22), (14, 16), (1, 30), (25, 30)):
+        ...     tree.insert(NumericRange(low, high))
+        >>> tree.find_all_overlaps_many(
+        ...     [NumericRange(19, 21), NumericRange(31, 40), NumericRange(15, 15)]
+        ... )
+        [[[18..22], [1..30], [20..24]], [], [[14..16], [1..30]]]
+
+        """
+        results: List[List[NumericRange]] = [[] for _ in queries]
+        if self.root is None:
+            return results
+        lows = [q.low for q in queries]
+        highs = [q.high for q in queries]
+
+        # Each stack entry is a subtree and the indexes of the queries
+        # that might overlap something in it.
+        stack = [(self.root, range(len(queries)))]
+        while stack:
+            node, active = stack.pop()
+            rv = node.value
+            low = rv.low
+            high = rv.high
+            for i in active:
+                if lows[i] <= high and highs[i] >= low:
+                    results[i].append(rv)
+
+            # Same pruning as _find_all_overlaps, applied per query.
+            right = node.right
+            if right is not None:
+                right_highest = right.value.highest_in_subtree
+                right_active = [
+                    i for i in active if highs[i] >= low and lows[i] <= right_highest
+                ]
+                if right_active:
+                    stack.append((right, right_active))
+            left = node.left
+            if left is not None:
+                left_highest = left.value.highest_in_subtree
+                left_active = [i for i in active if lows[i] <= left_highest]
+                if left_active:
+                    stack.append((left, left_active))
+        return results
 
 
 if __name__ == "__main__":
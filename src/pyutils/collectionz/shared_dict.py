@@ -34,6 +34,7 @@ at the root of this module.
 """
 
 import pickle
+import struct
 from contextlib import contextmanager
 from multiprocessing import RLock, shared_memory
 from typing import (
@@ -41,9 +42,11 @@ from typing import (
     Dict,
     Hashable,
     ItemsView,
+    Iterable,
     Iterator,
     KeysView,
     Optional,
+    Protocol,
     Tuple,
     ValuesView,
 )
@@ -52,6 +55,17 @@ from pyutils.exceptions import PyUtilsException
 from pyutils.typez.type_hints import Closable
 
 
+class Serializer(Protocol):
+    """Something that can turn a dict into bytes and back again.  See
+    :class:`PickleSerializer`."""
+
+    def dumps(self, obj: Dict[Hashable, Any]) -> bytes:
+        ...
+
+    def loads(self, data: bytes) -> Dict[Hashable, Any]:
+        ...
+
+
 class PickleSerializer:
     """A serializer that uses pickling.  Used to read/write bytes in the shared
     memory region and interpret them as a dict."""
@@ -139,6 +153,17 @@ class SharedDict(Closable):
         scenario the slowness of the dict writes are more than paid
         for by the avoidence of duplicated, expensive work.
 
+        Reads are cheaper: each process keeps the last dict it
+        deserialized and reuses it until some process writes to the
+        shared memory again.  Values read from a `SharedDict` are
+        therefore shared with that cached copy.  Don't modify them in
+        place without assigning them back to the `SharedDict`.
+
+        Every write re-serializes the whole dict so, when setting
+        several keys at once, prefer one call to :meth:`update` over
+        a loop of assignments.  Likewise :meth:`get_many` reads
+        several keys while holding the lock only once.
+
     Finally, someone (likely the main process) should call the :meth:`cleanup`
     method when the shared memory region is no longer needed::
 
@@ -150,13 +175,20 @@ class SharedDict(Closable):
     ---
     """
 
-    NULL_BYTE = b"\x00"
     LOCK = RLock()
 
+    # The shared memory region starts with a header holding a version
+    # number, bumped by every write, and the length of the serialized
+    # dict that follows it.  Readers deserialize just those bytes and
+    # only when the version differs from the one they last saw.  A
+    # newly created region is all zeros, i.e. has a length of zero.
+    HEADER = struct.Struct("<QQ")
+
     def __init__(
         self,
         name: Optional[str] = None,
         size_bytes: Optional[int] = None,
+        serializer: Optional[Serializer] = None,
     ) -> None:
         """Creates or attaches a shared dictionary back by a
         :class:`SharedMemory` buffer.  For create semantics, a unique
@@ -180,10 +212,18 @@ class SharedDict(Closable):
             name: the name of the shared dict, only required for initial caller
             size_bytes: the maximum size of data storable in the shared dict,
                 only required for the first caller.
+            serializer: how to convert the dict to and from bytes in
+                the shared memory region; defaults to a
+                :class:`PickleSerializer`.  Every process using the same
+                shared dict must use the same kind of serializer.
 
         """
         assert size_bytes is None or size_bytes > 0
-        self._serializer = PickleSerializer()
+        self._serializer = serializer or PickleSerializer()
+
+        # The (version, dict) last read from or written to the shared
+        # memory by this process.  The dict is never modified.
+        self._cache: Tuple[int, Dict[Hashable, Any]] = (0, {})
         self.shared_memory = self._get_or_create_memory_block(name, size_bytes)
         self._ensure_memory_initialization()
         self.name = self.shared_memory.name
@@ -205,38 +245,72 @@ class SharedDict(Closable):
             return shared_memory.SharedMemory(name=name)
         except FileNotFoundError:
             assert size_bytes is not None
-            return shared_memory.SharedMemory(name=name, create=True, size=size_bytes)
+            # The header lives in front of the data so that it doesn't
+            # eat into the caller's size_bytes.
+            return shared_memory.SharedMemory(
+                name=name, create=True, size=size_bytes + SharedDict.HEADER.size
+            )
 
     def _ensure_memory_initialization(self):
         """Internal helper."""
         with SharedDict.LOCK:
-            memory_is_empty = (
-                bytes(self.shared_memory.buf).split(SharedDict.NULL_BYTE, 1)[0] == b""
-            )
-            if memory_is_empty:
+            _, length = SharedDict.HEADER.unpack_from(self.shared_memory.buf)
+            if length == 0:
                 self.clear()
 
+    def _write_memory_unlocked(self, db: Dict[Hashable, Any]) -> None:
+        """Internal helper; the caller must hold SharedDict.LOCK."""
+        data = self._serializer.dumps(db)
+        start = SharedDict.HEADER.size
+        try:
+            self.shared_memory.buf[start : start + len(data)] = data
+        except ValueError as e:
+            raise ValueError("exceeds available storage") from e
+        version, _ = SharedDict.HEADER.unpack_from(self.shared_memory.buf)
+        version += 1
+        SharedDict.HEADER.pack_into(self.shared_memory.buf, 0, version, len(data))
+        self._cache = (version, db)
+
     def _write_memory(self, db: Dict[Hashable, Any]) -> None:
         """Internal helper."""
-        data = self._serializer.dumps(db)
         with SharedDict.LOCK:
-            try:
-                self.shared_memory.buf[: len(data)] = data
-            except ValueError as e:
-                raise ValueError("exceeds available storage") from e
+            self._write_memory_unlocked(db)
+
+    def _read_payload_unlocked(self) -> Tuple[int, Optional[bytes]]:
+        """Internal helper; the caller must hold SharedDict.LOCK.
+        Returns the version of the dict in the shared memory and a
+        copy of its serialized bytes, or None instead of the bytes if
+        that version is already cached."""
+        start = SharedDict.HEADER.size
+        version, length = SharedDict.HEADER.unpack_from(self.shared_memory.buf)
+        if version == self._cache[0]:
+            return version, None
+        return version, self.shared_memory.buf[start : start + length].tobytes()
+
+    def _load_payload(self, version: int, data: Optional[bytes]) -> Dict[Hashable, Any]:
+        """Internal helper; deserializes what _read_payload_unlocked
+        returned (or returns the cached dict)."""
+        if data is None:
+            return self._cache[1]
+        db = self._serializer.loads(data)
+        self._cache = (version, db)
+        return db
 
     def _read_memory(self) -> Dict[Hashable, Any]:
-        """Internal helper."""
+        """Internal helper.  The dict returned must not be modified."""
         with SharedDict.LOCK:
-            return self._serializer.loads(self.shared_memory.buf.tobytes())
+            version, data = self._read_payload_unlocked()
+        return self._load_payload(version, data)
 
     @contextmanager
     def _modify_dict(self):
         """Internal helper."""
         with SharedDict.LOCK:
-            db = self._read_memory()
+            # Modify a copy so that the cached dict stays intact if
+            # the write fails.
+            db = dict(self._load_payload(*self._read_payload_unlocked()))
             yield db
-            self._write_memory(db)
+            self._write_memory_unlocked(db)
 
     def close(self) -> None:
         """Unmap the shared dict and memory behind it from this
@@ -263,7 +337,7 @@ class SharedDict(Closable):
         Returns:
             A shallow copy of the shared dict.
         """
-        return self._read_memory()
+        return dict(self._read_memory())
 
     def __getitem__(self, key: Hashable) -> Any:
         return self._read_memory()[key]
@@ -314,6 +388,18 @@ class SharedDict(Closable):
         """
         return self._read_memory().get(key, default)
 
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """
+        Args:
+            keys: the keys to lookup
+
+        Returns:
+            A dict mapping each of keys that is present in the shared
+            dict to its value, all read at the same moment.
+        """
+        db = self._read_memory()
+        return {key: db[key] for key in keys if key in db}
+
     def keys(self) -> KeysView[Hashable]:
         return self._read_memory().keys()
 
@@ -18,7 +18,7 @@ stored beneath that node.  See examples below.
 """
 
 import logging
-from typing import Any, Dict, Generator, Sequence
+from typing import Any, Dict, Generator, List, Sequence
 
 logger = logging.getLogger(__name__)
 
@@ -320,16 +320,32 @@ class Trie(object):
         Helper that return a fancy representation of the Trie, used by
         :meth:`__repr__`.
         """
+        parts: List[str] = []
+        self._repr_fancy_parts(parts, padding, pointer, node, has_sibling)
+        return "".join(parts)
+
+    def _repr_fancy_parts(
+        self,
+        parts: List[str],
+        padding: str,
+        pointer: str,
+        node: Any,
+        has_sibling: bool,
+    ) -> None:
+        """
+        Helper for :meth:`_repr_fancy` that appends the pieces of the
+        representation to parts rather than concatenating strings.
+        """
         if node is None:
-            return ""
+            return
         if node is not self.root:
-            ret = f"\n{padding}{pointer}"
+            parts.append(f"\n{padding}{pointer}")
             if has_sibling:
                 padding += "│  "
             else:
                 padding += "   "
         else:
-            ret = f"{pointer}"
+            parts.append(f"{pointer}")
 
         child_count = 0
         for child in node:
@@ -346,8 +362,9 @@ class Trie(object):
                     has_sibling = False
                 pointer += f"{child}"
                 child_count -= 1
-                ret += self._repr_fancy(padding, pointer, node[child], has_sibling)
-        return ret
+                self._repr_fancy_parts(
+                    parts, padding, pointer, node[child], has_sibling
+                )
 
     def repr_brief(self, node: Dict[Any, Any], delimiter: str):
         """
@@ -369,18 +386,16 @@ class Trie(object):
         '10.[0.0.[1,2],10.10.[1,2]]'
 
         """
-        child_count = 0
-        my_rep = ""
+        child_reps = []
         for child in node:
             if child != self.end:
-                child_count += 1
                 child_rep = self.repr_brief(node[child], delimiter)
                 if len(child_rep) > 0:
-                    my_rep += str(child) + delimiter + child_rep + ","
+                    child_reps.append(str(child) + delimiter + child_rep)
                 else:
-                    my_rep += str(child) + ","
-        if len(my_rep) > 1:
-            my_rep = my_rep[:-1]
+                    child_reps.append(str(child))
+        child_count = len(child_reps)
+        my_rep = ",".join(child_reps)
         if child_count > 1:
             my_rep = f"[{my_rep}]"
         return my_rep
@@ -19,6 +19,10 @@ class Comparable(Protocol):
     for an easy way to make your type comparable.
     """
 
+    # So that classes which subclass this explicitly can use
+    # __slots__ (see e.g. :class:`pyutils.collectionz.interval_tree.NumericRange`).
+    __slots__ = ()
+
     @abstractmethod
     def __lt__(self, other: Any) -> bool:
         ...
@@ -4,6 +4,8 @@
 
 """shared_dict unittest."""
 
+import json
+import pickle
 import random
 import unittest
 
@@ -74,6 +76,86 @@ class SharedDictTest(unittest.TestCase):
             d.close()
             d.cleanup()
 
+    def test_sees_writes_through_other_handles(self):
+        dict_name = 'test_shared_dict_versions'
+        d = SharedDict(dict_name, 4096)
+        d2 = SharedDict(dict_name)
+        try:
+            d['a'] = 1
+            self.assertEqual(1, d['a'])
+            self.assertEqual(1, d2['a'])
+            d2['a'] = 2
+            self.assertEqual(2, d['a'])
+            copy = d.copy()
+            copy['b'] = 3
+            self.assertFalse('b' in d)
+            with self.assertRaises(ValueError):
+                d['c'] = 'x' * 4096
+            self.assertEqual({'a': 2}, d.copy())
+            self.assertEqual({'a': 2}, d2.copy())
+        finally:
+            d2.close()
+            d.close()
+            d.cleanup()
+
+    def test_tiny_sizes(self):
+        d = SharedDict('test_shared_dict_tiny', 12)
+        try:
+            self.assertEqual({}, d.copy())
+            with self.assertRaises(ValueError):
+                d['a'] = 'x' * 12
+            self.assertEqual({}, d.copy())
+        finally:
+            d.close()
+            d.cleanup()
+
+        # All of size_bytes is available for the dict's contents.
+        full = {1: 1, 2: 2}
+        size = len(pickle.dumps(full, pickle.HIGHEST_PROTOCOL))
+        d = SharedDict('test_shared_dict_exact', size)
+        try:
+            d.update(full)
+            self.assertEqual(full, d.copy())
+            with self.assertRaises(ValueError):
+                d[3] = 3
+            self.assertEqual(full, d.copy())
+        finally:
+            d.close()
+            d.cleanup()
+
+    def test_bulk_operations(self):
+        dict_name = 'test_shared_dict_bulk'
+        d = SharedDict(dict_name, 4096)
+        try:
+            d.update({n: n * n for n in range(10)})
+            self.assertEqual(10, len(d))
+            self.assertEqual({2: 4, 3: 9}, d.get_many([2, 3, 99]))
+            self.assertEqual({}, d.get_many([]))
+        finally:
+            d.close()
+            d.cleanup()
+
+    def test_custom_serializer(self):
+        class JsonSerializer:
+            def dumps(self, obj):
+                return json.dumps(obj).encode()
+
+            def loads(self, data):
+                return json.loads(data)
+
+        dict_name = 'test_shared_dict_json'
+        d = SharedDict(dict_name, 4096, serializer=JsonSerializer())
+        try:
+            d['a'] = [1, 2, 3]
+            d['b'] = 'two'
+            self.assertEqual({'a': [1, 2, 3], 'b': 'two'}, d.copy())
+            with self.assertRaises(ValueError):
+                d['c'] = 'x' * 4096
+            self.assertEqual(2, len(d))
+        finally:
+            d.close()
+            d.cleanup()
+
 
 if __name__ == '__main__':
     unittest.main()